@@ -1,178 +1,249 @@
 from flask import Flask, request, jsonify, abort
-import uuid
+from flask.json.provider import JSONProvider
+from werkzeug.exceptions import InternalServerError
+import click
+import orjson
 import sqlite3
-from datetime import datetime
 import os
 from dotenv import load_dotenv
 import re
-import json
+from database import (
+    SQL_SELECT_BY_ID, get_db_connection, setup_database, insert_complaints,
+    current_timestamp, cache_get, cache_put,
+)
 
 # Load environment variables
 load_dotenv(dotenv_path=".env")
 
+class OrjsonProvider(JSONProvider):
+    """JSON provider that parses requests and renders jsonify() responses with orjson."""
+
+    # Sort object keys like Flask's default provider does
+    sort_keys = True
+
+    def _dumps_bytes(self, obj, **kwargs):
+        option = orjson.OPT_SORT_KEYS if kwargs.get("sort_keys", self.sort_keys) else 0
+        return orjson.dumps(obj, default=kwargs.get("default"), option=option)
+
+    def dumps(self, obj, **kwargs):
+        return self._dumps_bytes(obj, **kwargs).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Same argument handling as jsonify(): one value as-is, several as a list, or keyword arguments as an object
+        if args and kwargs:
+            raise TypeError("jsonify() behavior undefined when passed both args and kwargs")
+        obj = (args[0] if len(args) == 1 else list(args)) if args else (kwargs or None)
+        # Hand orjson's bytes straight to the response instead of round-tripping through str
+        return self._app.response_class(self._dumps_bytes(obj), mimetype="application/json")
+
 # Initialize Flask app
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
-# Database file path
-DATABASE_PATH = "complaints.db"
-
-# Database connection function
-def get_db_connection():
-    """Establishes and returns a connection to the SQLite database."""
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row  # This allows accessing columns by name
-    return conn
+# Upper bound on the number of complaints accepted by one bulk request
+MAX_BULK_COMPLAINTS = 1000
 
 # Initialize database
 def init_database():
     """Create the complaints table if it doesn't exist."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS complaints (
-            complaint_id TEXT PRIMARY KEY,
-            name TEXT NOT NULL,
-            phone_number TEXT NOT NULL,
-            email TEXT NOT NULL,
-            complaint_details TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            status TEXT DEFAULT 'pending'
-        )
-    """)
-    
-    # Insert sample data if table is empty
-    cursor.execute("SELECT COUNT(*) FROM complaints")
-    if cursor.fetchone()[0] == 0:
-        sample_data = [
-            ('CMP001', 'John Doe', '1234567890', 'john@example.com', 'Delayed delivery of order #12345', '2025-06-25 10:30:00', 'pending'),
-            ('CMP002', 'Jane Smith', '9876543210', 'jane@example.com', 'Received wrong item in my order', '2025-06-26 14:20:00', 'resolved'),
-            ('CMP003', 'Mike Johnson', '5555555555', 'mike@example.com', 'Food quality was poor', '2025-06-27 09:15:00', 'pending')
-        ]
-        
-        cursor.executemany("""
-            INSERT INTO complaints (complaint_id, name, phone_number, email, complaint_details, created_at, status)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, sample_data)
-    
-    conn.commit()
-    conn.close()
+    setup_database()
 
-# Initialize database at startup
-init_database()
+@app.cli.command("init-db")
+def init_db_command():
+    """Create the complaints table and sample data (run once before starting workers)."""
+    init_database()
+    click.echo("Database initialized.")
+
+# Importing the app no longer touches the database; APP_INIT_DB=1 restores
+# initialization at import for deployments that cannot run `flask init-db` first
+if os.environ.get("APP_INIT_DB") == "1":
+    init_database()
+
+# Validation patterns, compiled once at import. They are applied with fullmatch,
+# which skips the anchor handling and, unlike match with '$', rejects a trailing newline.
+# For inputs this short the C regex engine is cheaper than hand-written scans or a
+# Numba kernel (whose dispatch and str.encode cost alone exceed the whole match).
+_PHONE_RE = re.compile(r'\+?[1-9]?[0-9]{7,15}')
+_EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+
+# Fields every complaint payload must provide with a non-empty value
+_REQUIRED_FIELDS = ("name", "phone_number", "email", "complaint_details")
 
 # Validation functions
 def validate_phone_number(phone: str) -> bool:
     """Validate phone number format."""
-    pattern = r'^[\+]?[1-9]?[0-9]{7,15}$'
-    return re.match(pattern, phone) is not None
+    return _PHONE_RE.fullmatch(phone) is not None
 
 def validate_email(email: str) -> bool:
     """Validate email format."""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return _EMAIL_RE.fullmatch(email) is not None
+
+def validate_complaint(data):
+    """Validate a complaint payload and return an error message, or None if it is valid."""
+    # Validate required fields (reports the first one missing, in declaration order)
+    for field in _REQUIRED_FIELDS:
+        value = data.get(field)
+        if not value:
+            return f"Missing or empty field: {field}"
+        if not isinstance(value, str):
+            return f"Field must be a string: {field}"
+
+    # Validate phone number
+    if not validate_phone_number(data["phone_number"]):
+        return "Invalid phone number format"
+
+    # Validate email
+    if not validate_email(data["email"]):
+        return "Invalid email format"
+
+    # Validate name and complaint details
+    if not data["name"].strip() or not data["complaint_details"].strip():
+        return "Name and complaint details are required"
+
+    return None
+
+# Error handlers
+@app.errorhandler(sqlite3.Error)
+def handle_database_error(e):
+    """Report database failures as 500s; write_transaction has already rolled back any write."""
+    return InternalServerError(description=f"Database error: {str(e)}")
 
 # API Endpoints
 @app.route("/complaints", methods=["POST"])
 def create_complaint():
     """Create a new complaint record."""
-    try:
-        # Get JSON data from request
-        data = request.get_json()
-        if not data:
-            abort(400, description="Invalid JSON data")
-
-        # Validate required fields
-        required_fields = ["name", "phone_number", "email", "complaint_details"]
-        for field in required_fields:
-            if field not in data or not data[field]:
-                abort(400, description=f"Missing or empty field: {field}")
-
-        # Validate phone number
-        if not validate_phone_number(data["phone_number"]):
-            abort(400, description="Invalid phone number format")
-
-        # Validate email
-        if not validate_email(data["email"]):
-            abort(400, description="Invalid email format")
-
-        # Validate name and complaint details
-        if not data["name"].strip() or not data["complaint_details"].strip():
-            abort(400, description="Name and complaint details are required")
-
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        try:
-            # Generate a unique complaint ID
-            complaint_id = "CMP" + str(uuid.uuid4())[:8].upper()
-            
-            # Insert the new complaint
-            cursor.execute("""
-                INSERT INTO complaints (complaint_id, name, phone_number, email, complaint_details)
-                VALUES (?, ?, ?, ?, ?)
-            """, (complaint_id, data["name"], data["phone_number"], 
-                  data["email"], data["complaint_details"]))
-            
-            conn.commit()
-            conn.close()
-            
-            return jsonify({
-                "complaint_id": complaint_id,
-                "message": "Complaint created successfully"
-            }), 200
-            
-        except Exception as e:
-            conn.close()
-            abort(500, description=f"Error creating complaint: {str(e)}")
-
-    except ValueError as e:
-        abort(400, description=str(e))
+    # Get JSON data from request
+    data = request.get_json()
+    if not data or not isinstance(data, dict):
+        abort(400, description="Invalid JSON data")
+
+    error = validate_complaint(data)
+    if error:
+        abort(400, description=error)
+
+    # Set here so the row can be cached without re-reading it
+    created_at = current_timestamp()
+
+    # Insert the new complaint; a generated ID that is already taken is replaced with a fresh one
+    [complaint_id] = insert_complaints(
+        [(data["name"], data["phone_number"], data["email"], data["complaint_details"])], created_at
+    )
+
+    cache_put(complaint_id, {
+        "complaint_id": complaint_id,
+        "name": data["name"],
+        "phone_number": data["phone_number"],
+        "email": data["email"],
+        "complaint_details": data["complaint_details"],
+        "created_at": created_at
+    })
+
+    return jsonify({
+        "complaint_id": complaint_id,
+        "message": "Complaint created successfully"
+    }), 200
+
+@app.route("/complaints/bulk", methods=["POST"])
+def create_complaints_bulk():
+    """Create many complaint records from a JSON array in a single transaction."""
+    data = request.get_json()
+    if not isinstance(data, list) or not data:
+        abort(400, description="Expected a non-empty JSON array of complaints")
+    if len(data) > MAX_BULK_COMPLAINTS:
+        abort(400, description=f"At most {MAX_BULK_COMPLAINTS} complaints per request")
+
+    # Validate everything up front so a bad item never leaves a partial batch behind
+    for index, item in enumerate(data):
+        error = validate_complaint(item) if isinstance(item, dict) else "Invalid JSON data"
+        if error:
+            abort(400, description=f"Complaint {index}: {error}")
+
+    # One transaction and one commit for the whole batch instead of one per row
+    complaint_ids = insert_complaints(
+        [(item["name"], item["phone_number"], item["email"], item["complaint_details"]) for item in data],
+        current_timestamp()
+    )
+
+    return jsonify({
+        "complaint_ids": complaint_ids,
+        "message": f"{len(complaint_ids)} complaints created successfully"
+    }), 200
 
 @app.route("/complaints/<complaint_id>", methods=["GET"])
 def get_complaint(complaint_id):
     """Retrieve complaint details by complaint ID."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    cached = cache_get(complaint_id)
     
-    try:
+    if cached is None:
         # Fetch complaint details
-        cursor.execute("""
-            SELECT complaint_id, name, phone_number, email, complaint_details, created_at 
-            FROM complaints WHERE complaint_id = ?
-        """, (complaint_id,))
-        
-        result = cursor.fetchone()
+        result = get_db_connection().execute(SQL_SELECT_BY_ID, (complaint_id,)).fetchone()
         
         if not result:
-            conn.close()
             abort(404, description="Complaint not found")
         
-        complaint_data = {
-            "complaint_id": result["complaint_id"],
-            "name": result["name"],
-            "phone_number": result["phone_number"],
-            "email": result["email"],
-            "complaint_details": result["complaint_details"],
-            "created_at": result["created_at"]
-        }
-        
-        conn.close()
-        return jsonify(complaint_data), 200
-        
-    except Exception as e:
-        conn.close()
-        abort(500, description=f"Error retrieving complaint: {str(e)}")
+        # Rows are plain tuples in SQL_SELECT_BY_ID column order
+        cid, name, phone_number, email, complaint_details, created_at = result
+        cached = cache_put(complaint_id, {
+            "complaint_id": cid,
+            "name": name,
+            "phone_number": phone_number,
+            "email": email,
+            "complaint_details": complaint_details,
+            "created_at": created_at
+        })
+    
+    complaint_data, etag = cached
+    # The client already has this row: answer with a bodyless 304 without serializing it
+    if request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+
+    response = jsonify(complaint_data)
+    response.set_etag(etag)
+    return response
+
+# Constant bodies for the root and health endpoints, serialized once at import
+_ROOT_BYTES = orjson.dumps({"message": "Complaint Management API is running"})
+_HEALTH_BYTES = orjson.dumps({"status": "healthy"})
 
 @app.route("/")
 def root():
     """Root endpoint."""
-    return jsonify({"message": "Complaint Management API is running"}), 200
+    return app.response_class(_ROOT_BYTES, mimetype="application/json",
+                              headers={"Cache-Control": "public, max-age=300"})
 
 @app.route("/health")
 def health_check():
-    """Health check endpoint."""
-    return jsonify({"status": "healthy"}), 200
+    """Health check endpoint (GET and HEAD are answered by health_check_middleware first)."""
+    # Never cached, so a probe always reaches a live worker
+    return app.response_class(_HEALTH_BYTES, mimetype="application/json",
+                              headers={"Cache-Control": "no-store"})
+
+def health_check_middleware(wsgi_app):
+    """Wrap a WSGI app so load balancer probes of /health skip Flask's request handling entirely."""
+    # Never cached, so a probe always reaches a live worker
+    headers = [
+        ("Content-Type", "application/json"),
+        ("Content-Length", str(len(_HEALTH_BYTES))),
+        ("Cache-Control", "no-store"),
+    ]
+
+    def middleware(environ, start_response):
+        method = environ.get("REQUEST_METHOD")
+        if environ.get("PATH_INFO") == "/health" and method in ("GET", "HEAD"):
+            start_response("200 OK", list(headers))
+            return [] if method == "HEAD" else [_HEALTH_BYTES]
+        return wsgi_app(environ, start_response)
+
+    return middleware
+
+app.wsgi_app = health_check_middleware(app.wsgi_app)
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=8000, debug=True)
\ No newline at end of file
+    # Development server only; production runs under gunicorn (see start.sh)
+    init_database()
+    app.run(host="0.0.0.0", port=8000, debug=os.environ.get("FLASK_DEBUG") == "1")
\ No newline at end of file
@@ -0,0 +1,172 @@
+import hashlib
+import secrets
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import orjson
+
+# Database file path
+DATABASE_PATH = "complaints.db"
+
+# Statements shared by the API and the chatbot tools. sqlite3 caches prepared statements
+# per connection, keyed by SQL text, so they are only compiled once per thread connection.
+SQL_INSERT = """
+    INSERT INTO complaints (complaint_id, name, phone_number, email, complaint_details, created_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(complaint_id) DO NOTHING
+"""
+SQL_SELECT_BY_ID = """
+    SELECT complaint_id, name, phone_number, email, complaint_details, created_at
+    FROM complaints WHERE complaint_id = ?
+"""
+SQL_UPDATE_STATUS = "UPDATE complaints SET status = ? WHERE complaint_id = ?"
+
+# Extra attempts with a fresh complaint ID when a generated one is already taken
+COMPLAINT_ID_RETRIES = 3
+
+# Per-connection tuning: relaxed fsync (safe under WAL), in-memory temp tables,
+# 256 MB memory-mapped I/O and a ~64 MB page cache
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-64000",
+)
+
+# WAL mode is persisted in the database file, so it is only switched on by the first connection
+_wal_enabled = False
+
+# One connection per thread, reused across calls instead of reopening the file
+_local = threading.local()
+
+# SQLite allows a single writer at a time, so writes are serialized here.
+# Connections run in autocommit mode; writes take the lock and open BEGIN IMMEDIATE
+# themselves (see write_transaction) instead of relying on implicit transactions
+_write_lock = threading.Lock()
+
+# Complaint rows never change after creation except for status, which lookups do not return,
+# so they are kept in a small in-process LRU keyed by complaint ID and need no invalidation
+COMPLAINT_CACHE_SIZE = 1024
+_complaint_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+def get_db_connection():
+    """Returns this thread's cached connection to the SQLite database, opening it on first use."""
+    global _wal_enabled
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(DATABASE_PATH, check_same_thread=False, isolation_level=None)
+        if not _wal_enabled:
+            conn.execute("PRAGMA journal_mode=WAL")
+            _wal_enabled = True
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        _local.conn = conn
+    return conn
+
+@contextmanager
+def write_transaction(conn):
+    """Runs the enclosed writes as one BEGIN IMMEDIATE transaction, holding the write lock throughout."""
+    with _write_lock:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            # SQLite ends the transaction itself on errors such as SQLITE_FULL or an interrupt
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+def setup_database(reset=False):
+    """Creates the 'complaints' table and sample data if missing; reset=True drops existing data first."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    # All setup statements commit together
+    with write_transaction(conn):
+        if reset:
+            # Drop the 'complaints' table for a clean setup
+            cursor.execute("DROP TABLE IF EXISTS complaints")
+            # Only this process's cache can be cleared here; API workers keep their own copies
+            # of the dropped rows until restarted
+            with _cache_lock:
+                _complaint_cache.clear()
+
+        # WITHOUT ROWID stores rows in the primary key B-tree, so a lookup by complaint_id
+        # is a single tree walk; status gets its own index for filtering
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS complaints (
+                complaint_id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                phone_number TEXT NOT NULL,
+                email TEXT NOT NULL,
+                complaint_details TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                status TEXT DEFAULT 'pending'
+            ) WITHOUT ROWID
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_status ON complaints(status)")
+
+        # Insert sample complaints for testing, only if the table is empty
+        cursor.execute("SELECT COUNT(*) FROM complaints")
+        if cursor.fetchone()[0] == 0:
+            sample_data = [
+                ('CMP001', 'John Doe', '1234567890', 'john@example.com', 'Delayed delivery of order #12345', '2025-06-25 10:30:00', 'pending'),
+                ('CMP002', 'Jane Smith', '9876543210', 'jane@example.com', 'Received wrong item in my order', '2025-06-26 14:20:00', 'resolved'),
+                ('CMP003', 'Mike Johnson', '5555555555', 'mike@example.com', 'Food quality was poor', '2025-06-27 09:15:00', 'pending')
+            ]
+
+            cursor.executemany("""
+                INSERT INTO complaints (complaint_id, name, phone_number, email, complaint_details, created_at, status)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, sample_data)
+
+def new_complaint_id():
+    """Generates a unique complaint ID."""
+    return "CMP" + secrets.token_hex(4).upper()
+
+def current_timestamp():
+    """Returns the current UTC time in the same format as SQLite's CURRENT_TIMESTAMP."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+def insert_complaints(complaints, created_at):
+    """Inserts (name, phone_number, email, complaint_details) tuples in one transaction.
+
+    Returns the new complaint IDs in input order. A generated ID that is already taken
+    is skipped by SQL_INSERT's ON CONFLICT clause (rowcount 0) and replaced with a fresh one, so a
+    collision does not fail the batch.
+    """
+    complaint_ids = []
+    conn = get_db_connection()
+    with write_transaction(conn):
+        for complaint in complaints:
+            for _ in range(COMPLAINT_ID_RETRIES + 1):
+                complaint_id = new_complaint_id()
+                if conn.execute(SQL_INSERT, (complaint_id, *complaint, created_at)).rowcount:
+                    break
+            else:
+                raise sqlite3.IntegrityError("Could not generate an unused complaint ID")
+            complaint_ids.append(complaint_id)
+    return complaint_ids
+
+def cache_get(complaint_id):
+    """Returns the cached (complaint_data, etag) pair for a complaint ID, or None."""
+    with _cache_lock:
+        entry = _complaint_cache.get(complaint_id)
+        if entry is not None:
+            _complaint_cache.move_to_end(complaint_id)
+        return entry
+
+def cache_put(complaint_id, complaint_data):
+    """Caches a complaint dict with its ETag (hashed once, from the sorted-key encoding the API serves) and returns the pair."""
+    etag = hashlib.sha1(orjson.dumps(complaint_data, option=orjson.OPT_SORT_KEYS)).hexdigest()
+    entry = (complaint_data, etag)
+    with _cache_lock:
+        _complaint_cache[complaint_id] = entry
+        _complaint_cache.move_to_end(complaint_id)
+        if len(_complaint_cache) > COMPLAINT_CACHE_SIZE:
+            _complaint_cache.popitem(last=False)
+    return entry
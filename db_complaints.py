@@ -1,98 +1,58 @@
 from dotenv import load_dotenv
 from langchain.agents import tool
 import os
-import sqlite3
-import uuid
-from datetime import datetime
+import sys
+from database import (
+    SQL_SELECT_BY_ID, SQL_UPDATE_STATUS, get_db_connection, write_transaction,
+    setup_database, insert_complaints, current_timestamp, cache_get, cache_put,
+)
 
 # Load environment variables from a .env file
 load_dotenv(dotenv_path=".env")
 
-# Database file path
-DATABASE_PATH = "complaints.db"
-
-def get_db_connection():
-    """Establishes and returns a connection to the SQLite database."""
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row  # This allows accessing columns by name
-    return conn
-
-def setup_complaints_database():
-    """Creates the 'complaints' table for storing complaint records."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    # Drop the 'complaints' table if it exists (for clean setup)
-    cursor.execute("DROP TABLE IF EXISTS complaints")
-
-    # Create the 'complaints' table with the necessary columns
-    cursor.execute("""
-        CREATE TABLE complaints (
-            complaint_id TEXT PRIMARY KEY,
-            name TEXT NOT NULL,
-            phone_number TEXT NOT NULL,
-            email TEXT NOT NULL,
-            complaint_details TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            status TEXT DEFAULT 'pending'
-        )
-    """)
-
-    # Insert sample complaints into the 'complaints' table for testing
-    sample_data = [
-        ('CMP001', 'John Doe', '1234567890', 'john@example.com', 'Delayed delivery of order #12345', '2025-06-25 10:30:00', 'pending'),
-        ('CMP002', 'Jane Smith', '9876543210', 'jane@example.com', 'Received wrong item in my order', '2025-06-26 14:20:00', 'resolved'),
-        ('CMP003', 'Mike Johnson', '5555555555', 'mike@example.com', 'Food quality was poor', '2025-06-27 09:15:00', 'pending')
-    ]
-    
-    cursor.executemany("""
-        INSERT INTO complaints (complaint_id, name, phone_number, email, complaint_details, created_at, status)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    """, sample_data)
-    
-    # Commit the changes to the database
-    conn.commit()
-    conn.close()
+def setup_complaints_database(reset=False):
+    """Creates the 'complaints' table for storing complaint records; reset=True drops existing data first."""
+    setup_database(reset=reset)
 
 @tool
 def create_complaint(name: str, phone_number: str, email: str, complaint_details: str):
     """Creates a new complaint record and returns the complaint ID."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
     try:
-        # Generate a unique complaint ID
-        complaint_id = "CMP" + str(uuid.uuid4())[:8].upper()
+        # created_at is set here so the row can be cached without re-reading it
+        created_at = current_timestamp()
         
-        # Insert the new complaint
-        cursor.execute("""
-            INSERT INTO complaints (complaint_id, name, phone_number, email, complaint_details)
-            VALUES (?, ?, ?, ?, ?)
-        """, (complaint_id, name, phone_number, email, complaint_details))
+        # Insert the new complaint; a generated ID that is already taken is replaced with a fresh one
+        [complaint_id] = insert_complaints([(name, phone_number, email, complaint_details)], created_at)
         
-        conn.commit()
-        conn.close()
+        cache_put(complaint_id, {
+            "complaint_id": complaint_id,
+            "name": name,
+            "phone_number": phone_number,
+            "email": email,
+            "complaint_details": complaint_details,
+            "created_at": created_at
+        })
         
         return {
             "complaint_id": complaint_id,
             "message": "Complaint created successfully"
         }
     except Exception as e:
-        conn.close()
         return f"Error creating complaint: {str(e)}"
 
 @tool
 def get_complaint_details(complaint_id: str):
     """Returns the complaint details based on the complaint ID."""
+    cached = cache_get(complaint_id)
+    if cached is not None:
+        return dict(cached[0])
+
     conn = get_db_connection()
     cursor = conn.cursor()
 
     try:
         # Fetch complaint details using the provided complaint_id
-        cursor.execute("""
-            SELECT complaint_id, name, phone_number, email, complaint_details, created_at 
-            FROM complaints WHERE complaint_id = ?
-        """, (complaint_id,))
+        cursor.execute(SQL_SELECT_BY_ID, (complaint_id,))
         result = cursor.fetchone()
 
         if result:
@@ -104,13 +64,11 @@ def get_complaint_details(complaint_id: str):
                 "complaint_details": result[4],
                 "created_at": result[5]
             }
-            conn.close()
-            return complaint_data
+            cache_put(complaint_id, complaint_data)
+            return dict(complaint_data)
         else:
-            conn.close()
             return "Complaint not found"
     except Exception as e:
-        conn.close()
         return f"Error retrieving complaint: {str(e)}"
 
 @tool
@@ -120,20 +78,68 @@ def update_complaint_status(complaint_id: str, status: str):
     cursor = conn.cursor()
     
     try:
-        cursor.execute("UPDATE complaints SET status = ? WHERE complaint_id = ?", (status, complaint_id))
-        conn.commit()
-        conn.close()
+        with write_transaction(conn):
+            cursor.execute(SQL_UPDATE_STATUS, (status, complaint_id))
         return f"Complaint status updated to {status}"
     except Exception as e:
-        conn.close()
         return f"Error updating complaint status: {str(e)}"
 
-# Initialize the database when this module is imported
-def initialize_database():
+class ComplaintWriter:
+    """Buffers complaints and inserts them one transaction per flush.
+
+    Use through complaint_writer(); pending rows are flushed when the block exits
+    cleanly and discarded if it raises. IDs are assigned at flush time, so they are
+    collected in complaint_ids. Bulk rows are not added to the lookup cache.
+    """
+
+    def __init__(self, flush_every=None):
+        self.flush_every = flush_every
+        self.complaint_ids = []
+        self._rows = []
+
+    def add(self, name, phone_number, email, complaint_details):
+        """Queues a complaint, flushing once flush_every complaints are pending."""
+        self._rows.append((name, phone_number, email, complaint_details))
+        if self.flush_every and len(self._rows) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """Writes all queued complaints in a single transaction."""
+        if not self._rows:
+            return
+        self.complaint_ids.extend(insert_complaints(self._rows, current_timestamp()))
+        self._rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.flush()
+        else:
+            self._rows = []
+        return False
+
+def complaint_writer(flush_every=None):
+    """Returns a ComplaintWriter; with flush_every=N it commits every N complaints instead of once at the end."""
+    return ComplaintWriter(flush_every)
+
+def bulk_create_complaints(complaints):
+    """Inserts (name, phone_number, email, complaint_details) tuples in one transaction and returns their IDs."""
+    with complaint_writer() as writer:
+        for complaint in complaints:
+            writer.add(*complaint)
+    return writer.complaint_ids
+
+# Initialize the database (existing complaints are kept unless reset is requested)
+def initialize_database(reset=False):
     """Initialize the database with sample data."""
-    setup_complaints_database()
+    setup_complaints_database(reset=reset)
     print("SQLite database setup completed successfully!")
+    if reset:
+        # Running API workers still serve dropped complaints from their lookup caches
+        print("Restart the API so its workers drop cached complaints from before the reset.", file=sys.stderr)
 
 if __name__ == "__main__":
-    # Test the database setup
-    initialize_database()
\ No newline at end of file
+    # Test the database setup; pass --reset to wipe existing complaints first
+    initialize_database(reset="--reset" in sys.argv[1:])
\ No newline at end of file
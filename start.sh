@@ -0,0 +1,18 @@
+#!/bin/sh
+# Serve the complaint API with gunicorn: one process per core, threaded workers
+# with keep-alive. Each worker thread keeps its own warm SQLite connection.
+set -e
+
+# DATABASE_PATH and the app module are resolved relative to the repository root
+cd "$(dirname "$0")"
+
+# Create the schema once here rather than in every worker
+flask --app api_server init-db
+
+exec gunicorn api_server:app \
+    --bind "0.0.0.0:${PORT:-8000}" \
+    --workers "${WEB_CONCURRENCY:-$(nproc)}" \
+    --worker-class gthread \
+    --threads "${GUNICORN_THREADS:-8}" \
+    --keep-alive 30 \
+    "$@"